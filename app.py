@@ -1,11 +1,18 @@
+import asyncio
+import json
+import os
 import gradio as gr
 import plotly.graph_objects as go
 import plotly.express as px
+import pandas as pd
 from datetime import datetime, date
+import threading
+import time
 import requests
-from collections import defaultdict
 import duckdb
-from huggingface_hub import HfFileSystem
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from huggingface_hub import HfApi, HfFileSystem
 
 HF_DATASET_API = 'https://datasets-server.huggingface.co/rows'
 DATASET_NAME = 'shachardon/ShareLM'
@@ -14,9 +21,91 @@ HF_PARQUET_PATH = "hf://datasets/shachardon/ShareLM@~parquet/**/**/*.parquet"
 # Initialize Hugging Face filesystem
 fs = HfFileSystem()
 
+# Column names commonly used for the conversation timestamp
+TIMESTAMP_FIELDS = ['timestamp', 'date', 'created_at', 'time', 'created', 'ts', 'datetime']
+
+# Shared DuckDB connection, created lazily by get_connection()
+_con = None
+_con_lock = threading.Lock()
+
+# Parquet URLs and columns from the last discovery, keyed by dataset revision
+PARQUET_METADATA_PATH = os.path.join('.cache', 'parquet_urls.json')
+
+# Local DuckDB file holding a (source, day) copy of the dataset, so
+# queries and app restarts don't re-download parquet data from HF
+CACHE_DB_PATH = 'sharelm_cache.duckdb'
+CACHE_TABLE_MAX_AGE = 6 * 60 * 60  # seconds
+# After a failed build, wait this long before retrying in the background
+# while the old table is still served, or before a cold start retries
+CACHE_BUILD_RETRY_DELAY = 5 * 60  # seconds
+CACHE_COLD_RETRY_DELAY = 10  # seconds
+_cache_built_at = None  # build start time of the current table, 0.0 if none
+_cache_invalidated_at = 0.0
+_cache_build_failed_at = 0.0
+_cache_refreshing = False
+_cache_table_lock = threading.Lock()
+_cache_build_lock = threading.Lock()
+
+# Chart layouts are built once and shared by every figure
+PIE_LAYOUT = go.Layout(
+    title="Source Breakdown",
+    height=500,
+    showlegend=True
+)
+LINE_LAYOUT = go.Layout(
+    title="Total Count Over Time",
+    xaxis_title="Date",
+    yaxis_title="Count",
+    height=500,
+    hovermode='x unified'
+)
+
+# Time series longer than this many days are plotted as weekly totals
+MAX_DAILY_POINTS = 365
+
+# Query results are cached for 5 minutes; the dataset rarely changes
+_data_cache = TTLCache(maxsize=64, ttl=300)
+_sources_cache = TTLCache(maxsize=1, ttl=300)
+# The dataset's file listing changes rarely, so the resolved URLs can be
+# reused for longer
+_urls_cache = TTLCache(maxsize=1, ttl=600)
+_cache_lock = threading.Lock()
+
+def get_dataset_revision():
+    """Get the current commit sha of the dataset repo, or None if unavailable"""
+    try:
+        return HfApi().dataset_info(DATASET_NAME).sha
+    except Exception as e:
+        print(f"Error getting dataset revision: {e}")
+        return None
+
+def load_parquet_metadata():
+    """Load the parquet URLs and columns saved by a previous run"""
+    try:
+        with open(PARQUET_METADATA_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_parquet_metadata(metadata):
+    """Save parquet URLs and columns so later runs can skip discovery"""
+    try:
+        os.makedirs(os.path.dirname(PARQUET_METADATA_PATH), exist_ok=True)
+        with open(PARQUET_METADATA_PATH, 'w') as f:
+            json.dump(metadata, f)
+    except OSError as e:
+        print(f"Error saving parquet metadata: {e}")
+
+@cached(cache=_urls_cache, lock=_cache_lock)
 def get_parquet_urls():
     """Get actual HTTP URLs for parquet files from Hugging Face"""
     try:
+        # Reuse the URLs resolved on a previous run if the dataset hasn't changed
+        revision = get_dataset_revision()
+        metadata = load_parquet_metadata()
+        if revision and metadata.get('revision') == revision and metadata.get('urls'):
+            return metadata['urls']
+        
         # Use HfFileSystem to get parquet file URLs
         # Try multiple path patterns
         parquet_files = []
@@ -51,6 +140,7 @@ def get_parquet_urls():
                 continue
         
         if urls:
+            save_parquet_metadata({'revision': revision, 'urls': urls})
             return urls
         else:
             raise Exception("No valid parquet URLs found")
@@ -58,247 +148,331 @@ def get_parquet_urls():
         print(f"Error getting parquet URLs: {e}")
         raise
 
+def get_connection():
+    """Get the shared DuckDB connection, creating it on first use"""
+    global _con
+    with _con_lock:
+        if _con is None:
+            # DuckDB's default thread count and memory limit already follow
+            # the container's CPU and memory quota, so they aren't overridden
+            con = duckdb.connect(CACHE_DB_PATH)
+            # Install and load httpfs extension for remote file access
+            con.execute("INSTALL httpfs;")
+            con.execute("LOAD httpfs;")
+            # Reuse parquet footers, HTTP metadata and connections across queries
+            con.execute("SET enable_http_metadata_cache=true;")
+            con.execute("SET enable_object_cache=true;")
+            con.execute("SET http_keep_alive=true;")
+            _con = con
+    # Each caller gets its own cursor so concurrent requests don't share state
+    return _con.cursor()
+
+def find_timestamp_field(columns):
+    """Pick the column that holds the conversation timestamp"""
+    for field in TIMESTAMP_FIELDS:
+        if field in columns:
+            return field
+    # Try to find any field that looks like a date
+    for key in columns:
+        if 'time' in key.lower() or 'date' in key.lower() or 'created' in key.lower():
+            return key
+    return None
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD filter value, returning None if empty or invalid"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+def build_cache_table(con, built_at):
+    """Copy the source and day of every conversation into the local cache table"""
+    # Get parquet file URLs
+    parquet_urls = get_parquet_urls()
+    if not parquet_urls:
+        raise Exception("No parquet files found")
+    
+    # Reuse the column list saved for these URLs, otherwise read it from
+    # the schema (only reads the parquet footer)
+    metadata = load_parquet_metadata()
+    columns = metadata.get('columns') if metadata.get('urls') == parquet_urls else None
+    if not columns:
+        con.execute("SELECT * FROM read_parquet(?) LIMIT 0", [parquet_urls[0]])
+        columns = [col[0] for col in con.description]
+        if metadata.get('urls') == parquet_urls:
+            save_parquet_metadata({**metadata, 'columns': columns})
+    timestamp_field = find_timestamp_field(columns)
+    if timestamp_field:
+        escaped_field = timestamp_field.replace('"', '""')
+        day_expr = f'CAST(TRY_CAST("{escaped_field}" AS TIMESTAMP) AS DATE)'
+    else:
+        day_expr = "NULL::DATE"
+    
+    # URLs are bound as a list parameter; read_parquet scans them all at once
+    # and only fetches the columns referenced here. union_by_name lines up
+    # columns by name in case the files' schemas differ in column order.
+    con.execute(f"""
+    CREATE OR REPLACE TABLE cache AS
+    SELECT source, {day_expr} AS d
+    FROM read_parquet(?, union_by_name = true)
+    """, [parquet_urls])
+    con.execute("CREATE OR REPLACE TABLE cache_meta AS SELECT CAST(? AS DOUBLE) AS built_at", [built_at])
+
+def cache_table_stale():
+    """Whether the cache table needs rebuilding; call with _cache_table_lock held"""
+    return (
+        not _cache_built_at
+        or _cache_invalidated_at >= _cache_built_at
+        or time.time() - _cache_built_at > CACHE_TABLE_MAX_AGE
+    )
+
+def rebuild_cache_table(con):
+    """Rebuild the local cache table unless another thread already refreshed it"""
+    global _cache_built_at, _cache_build_failed_at
+    with _cache_build_lock:
+        with _cache_table_lock:
+            if not cache_table_stale():
+                return
+        # The table reflects the dataset as of the start of the build, so an
+        # invalidation that arrives while it runs still marks it stale
+        started = time.time()
+        try:
+            build_cache_table(con, started)
+        except Exception:
+            with _cache_table_lock:
+                _cache_build_failed_at = time.time()
+            raise
+        with _cache_table_lock:
+            _cache_built_at = started
+            _cache_build_failed_at = 0.0
+    # Cached results are keyed on the table version; drop the old ones
+    with _cache_lock:
+        _data_cache.clear()
+        _sources_cache.clear()
+
+def ensure_cache_table(con):
+    """Make sure the local cache table exists, refreshing it in the background once stale"""
+    global _cache_built_at, _cache_refreshing
+    with _cache_table_lock:
+        if _cache_built_at is None:
+            # First use in this process: pick up a table left by a previous run
+            exists = con.execute(
+                "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'cache_meta'"
+            ).fetchone()[0]
+            _cache_built_at = con.execute("SELECT built_at FROM cache_meta").fetchone()[0] if exists else 0.0
+        
+        since_failure = time.time() - _cache_build_failed_at
+        
+        if _cache_built_at:
+            # A table exists: keep serving it and rebuild off the request path
+            if cache_table_stale() and since_failure > CACHE_BUILD_RETRY_DELAY and not _cache_refreshing:
+                _cache_refreshing = True
+                threading.Thread(target=refresh_cache_table_in_background, daemon=True).start()
+            return
+    
+    # No table to fall back on, so the request has to wait for the build.
+    # Only a short back-off here, so a brief outage doesn't lock out cold starts.
+    if since_failure <= CACHE_COLD_RETRY_DELAY:
+        raise Exception("Building the local cache table failed moments ago; please retry shortly")
+    rebuild_cache_table(con)
+
+def refresh_cache_table():
+    """Rebuild the local cache table now, keeping the old one if the build fails"""
+    con = None
+    try:
+        con = get_connection()
+        rebuild_cache_table(con)
+    except Exception as e:
+        print(f"Error refreshing cache table: {e}")
+    finally:
+        if con is not None:
+            con.close()
+
+def refresh_cache_table_in_background():
+    """Thread target for the automatic refresh started by ensure_cache_table"""
+    global _cache_refreshing
+    try:
+        refresh_cache_table()
+    finally:
+        with _cache_table_lock:
+            _cache_refreshing = False
+
+def invalidate_cache_table():
+    """Mark the local cache table stale so the next build replaces it"""
+    global _cache_invalidated_at, _cache_build_failed_at
+    with _cache_table_lock:
+        _cache_invalidated_at = time.time()
+        # An explicit refresh shouldn't wait out the failure back-off
+        _cache_build_failed_at = 0.0
+
+def cache_key(max_rows=None, min_date=None, max_date=None, selected_sources=None):
+    """Build a hashable cache key from the query filters and the cache table version"""
+    return hashkey(_cache_built_at, max_rows, min_date or None, max_date or None, tuple(sorted(selected_sources or [])))
+
+def sources_cache_key():
+    """Key the source list on the cache table version"""
+    return hashkey(_cache_built_at)
+
+def clear_caches():
+    """Drop all cached query results so the next request re-reads the dataset"""
+    with _cache_lock:
+        _data_cache.clear()
+        _sources_cache.clear()
+        _urls_cache.clear()
+    invalidate_cache_table()
+
+@cached(cache=_data_cache, key=cache_key, lock=_cache_lock)
 def fetch_dataset_with_duckdb(max_rows=None, min_date=None, max_date=None, selected_sources=None):
-    """Fetch data from HuggingFace dataset using DuckDB with HTTP URLs"""
+    """Fetch source and per-day conversation counts, aggregated in DuckDB"""
     try:
-        con = duckdb.connect()
-        
-        # Install and load httpfs extension for remote file access
-        con.execute("INSTALL httpfs;")
-        con.execute("LOAD httpfs;")
-        
-        # Get parquet file URLs
-        parquet_urls = get_parquet_urls()
-        if not parquet_urls:
-            raise Exception("No parquet files found")
-        
-        # Build UNION query for multiple parquet files
-        # Escape single quotes in URLs to prevent SQL injection
-        table_queries = []
-        for url in parquet_urls:
-            # Escape single quotes by doubling them (SQL standard)
-            escaped_url = url.replace("'", "''")
-            table_queries.append(f"SELECT * FROM read_parquet('{escaped_url}')")
-        
-        base_query = " UNION ALL ".join(table_queries)
-        
-        # Build the query with filters
-        query = f"""
-        SELECT *
-        FROM ({base_query}) AS data
+        # Build the filtered sample; both aggregations run over it.
+        # Filter values are bound as parameters rather than inlined.
+        query = """
+        SELECT source, d AS day
+        FROM cache
         WHERE 1=1
         """
-        
-        # Note: Date filtering will be done in Python after we see the actual column names
-        # This avoids SQL errors if the timestamp column has a different name
+        params = []
         
         # Add source filter if provided
         if selected_sources and len(selected_sources) > 0:
-            # Escape single quotes to prevent SQL injection
-            escaped_sources = [s.replace("'", "''") for s in selected_sources]
-            sources_str = "', '".join(escaped_sources)
-            query += f" AND source IN ('{sources_str}')"
+            placeholders = ", ".join("?" for _ in selected_sources)
+            query += f" AND source IN ({placeholders})"
+            params.extend(selected_sources)
+        
+        # Add date filters
+        min_date_obj = parse_date(min_date)
+        max_date_obj = parse_date(max_date)
+        if min_date_obj:
+            query += " AND d >= ?"
+            params.append(min_date_obj)
+        if max_date_obj:
+            query += " AND d <= ?"
+            params.append(max_date_obj)
         
         # Add limit if specified
         if max_rows:
-            query += f" LIMIT {max_rows}"
-        
-        # Execute query and fetch results
-        result = con.execute(query).fetchdf()
-        con.close()
+            query += " LIMIT ?"
+            params.append(int(max_rows))
         
-        # Convert DataFrame to list of dicts (matching old format)
-        rows = []
-        for _, row in result.iterrows():
-            rows.append({'row': row.to_dict()})
-        
-        return rows
+        con = get_connection()
+        try:
+            ensure_cache_table(con)
+            
+            # One scan of the sample feeds both aggregations; rows are tagged
+            # so they can be split back apart in Python
+            rows = con.execute(f"""
+            WITH sample AS MATERIALIZED ({query})
+            SELECT 'source' AS tag, source AS key, COUNT(*) AS c
+            FROM sample
+            GROUP BY source
+            UNION ALL
+            SELECT 'day' AS tag, strftime(day, '%Y-%m-%d') AS key, COUNT(*) AS c
+            FROM sample
+            WHERE day IS NOT NULL
+            GROUP BY day
+            ORDER BY tag, key
+            """, params).fetchall()
+        finally:
+            con.close()
+        
+        source_counts = [(key, count) for tag, key, count in rows if tag == 'source']
+        time_series = [(key, count) for tag, key, count in rows if tag == 'day']
+        
+        return source_counts, time_series
     except Exception as e:
         print(f"Error fetching data with DuckDB: {e}")
         raise
 
 def fetch_dataset_sample(max_rows=500):
-    """Fetch a sample from the Hugging Face dataset using DuckDB"""
+    """Fetch aggregated counts for a sample of the dataset using DuckDB"""
     return fetch_dataset_with_duckdb(max_rows=max_rows)
 
 def process_data(max_rows, min_date, max_date, selected_sources):
     """Process dataset and return charts with filters using DuckDB"""
     try:
-        # Fetch data (source filter is done in SQL, date filter in Python)
-        rows = fetch_dataset_with_duckdb(max_rows=max_rows, min_date=None, max_date=None, selected_sources=selected_sources)
+        # Filtering and aggregation both happen in SQL
+        source_counts, time_series = fetch_dataset_with_duckdb(
+            max_rows=max_rows, min_date=min_date, max_date=max_date, selected_sources=selected_sources
+        )
         
-        if not rows:
+        if not source_counts:
             return None, None, "No data fetched. Please try again."
         
-        # Parse date filters
-        min_date_obj = None
-        max_date_obj = None
-        if min_date:
-            try:
-                min_date_obj = datetime.strptime(min_date, '%Y-%m-%d').date()
-            except:
-                pass
-        if max_date:
-            try:
-                max_date_obj = datetime.strptime(max_date, '%Y-%m-%d').date()
-            except:
-                pass
-        
-        source_counts = defaultdict(int)
-        time_series = defaultdict(int)
-        filtered_count = 0
-        
-        # Find the timestamp field name by checking first row
-        timestamp_field = None
-        if rows:
-            first_row_data = rows[0].get('row', rows[0]) if isinstance(rows[0], dict) else rows[0]
-            # Debug: print available fields
-            print(f"Available fields in first row: {list(first_row_data.keys())}")
-            timestamp_fields = ['timestamp', 'date', 'created_at', 'time', 'created', 'ts', 'datetime']
-            for field in timestamp_fields:
-                if field in first_row_data:
-                    timestamp_field = field
-                    print(f"Found timestamp field: {field}")
-                    break
-            if not timestamp_field:
-                # Try to find any field that looks like a date
-                for key in first_row_data.keys():
-                    if 'time' in key.lower() or 'date' in key.lower() or 'created' in key.lower():
-                        timestamp_field = key
-                        print(f"Found potential timestamp field: {key}")
-                        break
-        
-        for row in rows:
-            row_data = row.get('row', row) if isinstance(row, dict) else row
-            
-            # Filter by source (already done in SQL, but double-check)
-            source = row_data.get('source', 'unknown')
-            if selected_sources and len(selected_sources) > 0 and source not in selected_sources:
-                continue
-            
-            # Filter by date in Python
-            row_date = None
-            if timestamp_field and timestamp_field in row_data and row_data[timestamp_field] is not None:
-                try:
-                    timestamp_val = str(row_data[timestamp_field])
-                    # Try different date formats
-                    if 'T' in timestamp_val:
-                        # ISO format
-                        dt = datetime.fromisoformat(timestamp_val.replace('Z', '+00:00').split('.')[0])
-                    elif ' ' in timestamp_val:
-                        # Datetime string
-                        dt = datetime.strptime(timestamp_val.split('.')[0], '%Y-%m-%d %H:%M:%S')
-                    else:
-                        # Date only format
-                        dt = datetime.strptime(timestamp_val, '%Y-%m-%d')
-                    
-                    row_date = dt.date()
-                    
-                    # Apply date filters
-                    if min_date_obj and row_date < min_date_obj:
-                        continue
-                    if max_date_obj and row_date > max_date_obj:
-                        continue
-                except Exception as e:
-                    pass
-            
-            filtered_count += 1
-            
-            # Count by source
-            source_counts[source] += 1
-            
-            # Count by date
-            if row_date:
-                date_key = row_date.strftime('%Y-%m-%d')
-                time_series[date_key] += 1
-        
         # Create source breakdown pie chart
-        if source_counts:
-            sources = list(source_counts.keys())
-            values = list(source_counts.values())
-            
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=sources,
-                values=values,
-                hole=0.4,
-                textinfo='label+percent',
-                textposition='outside'
-            )])
-            fig_pie.update_layout(
-                title="Source Breakdown",
-                height=500,
-                showlegend=True
-            )
-        else:
-            fig_pie = None
+        sources = [source for source, _ in source_counts]
+        values = [count for _, count in source_counts]
+        
+        fig_pie = go.Figure(data=[go.Pie(
+            labels=sources,
+            values=values,
+            hole=0.4,
+            textinfo='label+percent',
+            textposition='outside'
+        )], layout=PIE_LAYOUT)
         
         # Create time series chart
+        sorted_dates = []
         if time_series:
-            sorted_dates = sorted(time_series.keys())
-            counts = [time_series[date] for date in sorted_dates]
+            sorted_dates = [day for day, _ in time_series]
+            counts = [count for _, count in time_series]
+            trace_name = 'Conversations'
             
-            fig_line = go.Figure()
-            fig_line.add_trace(go.Scatter(
+            # Bucket long ranges by week to keep the number of points small
+            weekly = len(sorted_dates) > MAX_DAILY_POINTS
+            if weekly:
+                weekly_counts = pd.Series(counts, index=pd.to_datetime(sorted_dates)).resample('W').sum()
+                sorted_dates = weekly_counts.index.strftime('%Y-%m-%d').tolist()
+                counts = weekly_counts.tolist()
+                trace_name = 'Conversations (weekly)'
+            
+            # WebGL rendering stays responsive with many points
+            fig_line = go.Figure(data=[go.Scattergl(
                 x=sorted_dates,
                 y=counts,
                 mode='lines+markers',
-                name='Conversations',
+                name=trace_name,
                 line=dict(width=2)
-            ))
-            fig_line.update_layout(
-                title="Total Count Over Time",
-                xaxis_title="Date",
-                yaxis_title="Count",
-                height=500,
-                hovermode='x unified'
-            )
+            )], layout=LINE_LAYOUT)
+            if weekly:
+                # pandas labels each weekly bucket with its last day (Sunday)
+                fig_line.update_layout(xaxis_title="Week ending")
         else:
             fig_line = None
         
-        total = sum(source_counts.values())
-        info = f"Fetched {len(rows)} rows\nAfter filters: {filtered_count} rows\nTotal conversations: {total:,}\nSources: {len(source_counts)}\nTime points: {len(time_series)}"
+        total = sum(values)
+        row_limit = f"{int(max_rows):,}" if max_rows else "none"
+        info = f"Row limit: {row_limit}\nRows after filters: {total:,}\nSources: {len(source_counts)}\nTime points: {len(sorted_dates)}"
         
         return (fig_pie, fig_line, info)
         
     except Exception as e:
         return (None, None, f"Error: {str(e)}")
 
-def get_available_sources(max_rows=1000):
-    """Get list of available sources for the filter using DuckDB"""
+@cached(cache=_sources_cache, key=sources_cache_key, lock=_cache_lock)
+def fetch_available_sources():
+    """Query the distinct sources in the dataset (results are cached)"""
+    con = get_connection()
     try:
-        con = duckdb.connect()
-        
-        # Install and load httpfs extension for remote file access
-        con.execute("INSTALL httpfs;")
-        con.execute("LOAD httpfs;")
-        
-        # Get parquet file URLs
-        parquet_urls = get_parquet_urls()
-        if not parquet_urls:
-            return []
-        
-        # Build UNION query for multiple parquet files
-        # Escape single quotes in URLs to prevent SQL injection
-        table_queries = []
-        for url in parquet_urls:
-            # Escape single quotes by doubling them (SQL standard)
-            escaped_url = url.replace("'", "''")
-            table_queries.append(f"SELECT DISTINCT source FROM read_parquet('{escaped_url}')")
-        
-        base_query = " UNION ".join(table_queries)
+        ensure_cache_table(con)
         
         # Query to get distinct sources
-        query = f"""
+        result = con.execute("""
         SELECT DISTINCT source
-        FROM ({base_query}) AS data
+        FROM cache
         ORDER BY source
-        """
-        
-        result = con.execute(query).fetchdf()
+        """).fetchall()
+    finally:
         con.close()
-        
-        sources = result['source'].tolist() if not result.empty else []
-        return sources
+    
+    return [row[0] for row in result]
+
+def get_available_sources():
+    """Get list of available sources for the filter using DuckDB"""
+    try:
+        return fetch_available_sources()
     except Exception as e:
         print(f"Error getting sources with DuckDB: {e}")
         return []
@@ -341,6 +515,7 @@ def create_interface():
                 )
                 
                 btn = gr.Button("Load & Analyze Data", variant="primary", size="lg")
+                refresh_btn = gr.Button("Refresh Data", variant="secondary")
             
             with gr.Column(scale=2):
                 with gr.Row():
@@ -351,53 +526,96 @@ def create_interface():
                 
                 info_text = gr.Textbox(label="Statistics", lines=4, interactive=False)
         
-        def analyze_with_source_update(max_rows_val, min_date_val, max_date_val, selected_sources_val):
+        # Source list for this session, filled on first load and reused by later clicks
+        sources_state = gr.State([])
+        
+        async def analyze_with_source_update(max_rows_val, min_date_val, max_date_val, selected_sources_val, known_sources):
             """Analyze data and update source filter"""
-            # Get available sources from the data
-            try:
-                available_sources = get_available_sources(min(max_rows_val, 1000))
-            except Exception as e:
-                print(f"Error getting available sources: {e}")
-                available_sources = []
+            # An empty selection already means all sources, so the analysis
+            # doesn't need to wait for the source list
+            data_task = asyncio.to_thread(process_data, max_rows_val, min_date_val, max_date_val, selected_sources_val or [])
+            if known_sources:
+                # Reuse the source list kept in session state
+                available_sources, results = known_sources, await data_task
+            else:
+                available_sources, results = await asyncio.gather(
+                    asyncio.to_thread(get_available_sources),
+                    data_task
+                )
             
             # If no sources selected, use all available
             if not selected_sources_val or len(selected_sources_val) == 0:
                 selected_sources_val = available_sources
             else:
                 # Filter to only include sources that exist
-                selected_sources_val = [s for s in selected_sources_val if s in available_sources]
-            
-            # Analyze data
-            results = process_data(max_rows_val, min_date_val, max_date_val, selected_sources_val)
+                available_set = frozenset(available_sources)
+                selected_sources_val = [s for s in selected_sources_val if s in available_set]
             
             # Return results and updated source filter using gr.update()
-            return results[0], results[1], results[2], gr.update(choices=available_sources, value=selected_sources_val)
+            return results[0], results[1], results[2], gr.update(choices=available_sources, value=selected_sources_val), available_sources
         
         btn.click(
             fn=analyze_with_source_update,
+            inputs=[max_rows, min_date, max_date, source_filter, sources_state],
+            outputs=[pie_chart, line_chart, info_text, source_filter, sources_state]
+        )
+        
+        async def refresh_and_analyze(max_rows_val, min_date_val, max_date_val, selected_sources_val):
+            """Drop cached results and re-run the analysis against fresh data"""
+            clear_caches()
+            # Rebuild the cache table before querying so this click sees the new data
+            await asyncio.to_thread(refresh_cache_table)
+            # Passing no known sources forces the source list to be reloaded
+            return await analyze_with_source_update(max_rows_val, min_date_val, max_date_val, selected_sources_val, [])
+        
+        refresh_btn.click(
+            fn=refresh_and_analyze,
             inputs=[max_rows, min_date, max_date, source_filter],
-            outputs=[pie_chart, line_chart, info_text, source_filter]
+            outputs=[pie_chart, line_chart, info_text, source_filter, sources_state]
         )
         
         # Load data on startup with default values
-        def initial_load():
+        async def initial_load():
             try:
-                sources = get_available_sources(1000)
-                results = process_data(1000, None, None, sources if sources else [])
-                return results[0], results[1], results[2], gr.update(choices=sources, value=sources if sources else [])
+                # Both are independent scans, so overlap their network I/O.
+                # An empty source filter selects every source.
+                sources, results = await asyncio.gather(
+                    asyncio.to_thread(get_available_sources),
+                    asyncio.to_thread(process_data, 1000, None, None, [])
+                )
+                return results[0], results[1], results[2], gr.update(choices=sources, value=sources if sources else []), sources
             except Exception as e:
                 import traceback
                 error_msg = f"Error loading initial data: {str(e)}\n{traceback.format_exc()}"
-                return None, None, error_msg, gr.update(choices=[], value=[])
+                return None, None, error_msg, gr.update(choices=[], value=[]), []
         
         demo.load(
             fn=initial_load,
-            outputs=[pie_chart, line_chart, info_text, source_filter]
+            outputs=[pie_chart, line_chart, info_text, source_filter, sources_state]
         )
     
     return demo
 
+def warm_up():
+    """Build or load the local cache table and prefill the query caches for initial_load"""
+    try:
+        con = get_connection()
+        try:
+            ensure_cache_table(con)
+        finally:
+            con.close()
+        # Same arguments as initial_load, so the first page load is a cache hit
+        fetch_dataset_with_duckdb(max_rows=1000, min_date=None, max_date=None, selected_sources=[])
+    except Exception as e:
+        print(f"Error warming up DuckDB: {e}")
+    get_available_sources()
+
+# Warm up in the background so the first page load is fast
+threading.Thread(target=warm_up, daemon=True).start()
+
 if __name__ == "__main__":
     demo = create_interface()
+    # Let several users' requests overlap their network waits
+    demo.queue(default_concurrency_limit=4, max_size=20)
     demo.launch(server_name="0.0.0.0", server_port=7860)
 